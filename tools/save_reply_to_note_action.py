@@ -8,16 +8,150 @@ license: MIT
 required_open_webui_version: 0.6.43
 """
 
+import asyncio
 import hashlib
+import importlib
 import re
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 from typing import Any, Optional
 
 from pydantic import BaseModel, Field
 
+_DETAILS_RE = re.compile(
+    r"<details[^>]*type=[\"']reasoning[\"'][^>]*>[\s\S]*?</details>",
+    re.IGNORECASE,
+)
+_DETAILS_OPEN_RE = re.compile(r"<details[^>]*type=[\"']reasoning[\"']", re.IGNORECASE)
+_MULTI_NL_RE = re.compile(r"\n{3,}")
+_WS_RE = re.compile(r"\s+")
+
+# 重复检测指纹只覆盖前 64K 字符，避免超长回答整段编码+哈希
+_HASH_PREFIX_CHARS = 65536
+
+
+_IMPORT_CACHE: dict[tuple, tuple] = {}
+_IMPORT_LOCK = threading.Lock()
+
+
+def _cached_import(module_name: str, *names: str) -> tuple:
+    # 首次成功导入后缓存，之后调用不再经过 import 机制
+    key = (module_name, names)
+    cached = _IMPORT_CACHE.get(key)
+    if cached is None:
+        with _IMPORT_LOCK:
+            cached = _IMPORT_CACHE.get(key)
+            if cached is None:
+                module = importlib.import_module(module_name)
+                cached = tuple(getattr(module, name) for name in names)
+                _IMPORT_CACHE[key] = cached
+    return cached
+
+
+class _LRUCache:
+    # 线程安全的有界 LRU 缓存，超出容量时淘汰最久未使用的条目；可选 ttl（秒）过期
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return entry[0] if entry is not None else None
+
+
+# (user_id, content_hash) -> note_id，连续重复点击时免去哈希查询
+_RECENT_SAVES = _LRUCache(maxsize=1024)
+# (chat_id, user_id) -> 会话标题，短 TTL 吸收同一会话连续保存时的重复查询
+_CHAT_TITLE_CACHE = _LRUCache(maxsize=512, ttl=30)
+# user_id -> 是否存在旧版本（仅有 content_sha256）的笔记；新保存不会再产生此类笔记
+_LEGACY_NOTE_USERS = _LRUCache(maxsize=1024, ttl=600)
+# 用户级阀门原始字典内容 -> UserValves 实例，避免每次调用都做 Pydantic 校验
+_USER_VALVES_CACHE = _LRUCache(maxsize=256)
+
+
+# (分钟序号, 格式化时间戳)；整体替换元组，避免多线程下两者不一致
+_MINUTE_TIMESTAMP = (-1, "")
+
+
+def _minute_timestamp() -> str:
+    # 标题只精确到分钟，同一分钟内复用已格式化的字符串
+    global _MINUTE_TIMESTAMP
+    minute = int(time.time()) // 60
+    cached_minute, cached_text = _MINUTE_TIMESTAMP
+    if minute != cached_minute:
+        cached_text = datetime.fromtimestamp(minute * 60).strftime("%Y-%m-%d %H:%M")
+        _MINUTE_TIMESTAMP = (minute, cached_text)
+    return cached_text
+
+
+def _legacy_content_hash(content: str) -> str:
+    # 旧版本写入 meta.content_sha256 的全文 SHA-256，仅用于匹配升级前保存的笔记
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _collapse_blank_lines(text: str) -> str:
+    if "\n\n\n" in text:
+        text = _MULTI_NL_RE.sub("\n\n", text)
+    return text.strip()
+
+
+def _tag_start_pattern(start_tag: str) -> str:
+    # 形如 <think> 的标签允许带属性；其余按字面匹配
+    if start_tag.startswith("<") and start_tag.endswith(">") and not start_tag.startswith("<|"):
+        return rf"<{re.escape(start_tag[1:-1])}(?:\s.*?)?>"
+    return re.escape(start_tag)
+
+
+def _tag_start_token(start_tag: str) -> str:
+    # 小写的起始标记前缀，用于正则前的快速子串判断
+    if start_tag.startswith("<") and start_tag.endswith(">") and not start_tag.startswith("<|"):
+        return start_tag[:-1].lower()
+    return start_tag.lower()
+
+
+def _compile_tag_pairs(tag_pairs: list[tuple[str, str]]) -> tuple:
+    # 每个标签对预编译为（小写起始标记, 闭合块, 未闭合到结尾）；忽略大小写后重复的标签对只保留一个
+    compiled = []
+    for start, end in dict.fromkeys((start.lower(), end.lower()) for start, end in tag_pairs):
+        start_pattern = _tag_start_pattern(start)
+        compiled.append(
+            (
+                _tag_start_token(start),
+                re.compile(rf"{start_pattern}[\s\S]*?{re.escape(end)}", re.IGNORECASE),
+                re.compile(rf"{start_pattern}[\s\S]*$", re.IGNORECASE),
+            )
+        )
+    return tuple(compiled)
+
 
 class Action:
-    REASONING_BLOCK_TYPES = {"reasoning", "thinking", "thought", "reason"}
+    NOTE_SOURCE = "save_reply_to_note_action"
+    REASONING_BLOCK_TYPES = frozenset({"reasoning", "thinking", "thought", "reason"})
     REASONING_TAG_PAIRS = [
         ("<think>", "</think>"),
         ("<thinking>", "</thinking>"),
@@ -28,6 +162,7 @@ class Action:
         ("<|begin_of_thought|>", "<|end_of_thought|>"),
         ("◁think▷", "◁/think▷"),
     ]
+    _THINK_TAG_PAIRS = _compile_tag_pairs(REASONING_TAG_PAIRS)
 
     class Valves(BaseModel):
         title_prefix: str = Field(
@@ -44,7 +179,7 @@ class Action:
         )
         duplicate_scan_limit: int = Field(
             default=100,
-            description="用于重复检测的最近笔记扫描数量。",
+            description="直接按内容哈希查询不可用时，兜底重复检测扫描的最近笔记数量。",
         )
         max_title_length: int = Field(
             default=80,
@@ -69,169 +204,309 @@ class Action:
         if isinstance(user_valves, self.UserValves):
             return user_valves
         if isinstance(user_valves, dict):
-            return self.UserValves(**user_valves)
+            try:
+                key = tuple(sorted(user_valves.items()))
+                cached = _USER_VALVES_CACHE.get(key)
+            except TypeError:
+                # 含不可哈希的值时不缓存
+                return self.UserValves(**user_valves)
+            if cached is None:
+                cached = self.UserValves(**user_valves)
+                _USER_VALVES_CACHE.put(key, cached)
+            return cached
         return self.UserValves()
 
-    def _content_to_markdown(self, content: Any) -> str:
+    def _content_parts(self, content: Any) -> list[str]:
+        # 返回已 strip 的非空文本片段，由调用方决定如何清理与拼接
         if content is None:
-            return ""
+            return []
 
         if isinstance(content, str):
-            return content.strip()
+            text = content.strip()
+            return [text] if text else []
 
         if isinstance(content, list):
             parts = []
             for item in content:
                 if isinstance(item, str):
-                    if item.strip():
-                        parts.append(item.strip())
+                    text = item.strip()
+                    if text:
+                        parts.append(text)
+                    continue
+
+                if not isinstance(item, dict):
                     continue
 
-                if isinstance(item, dict):
-                    item_type = item.get("type")
-                    if item_type in self.REASONING_BLOCK_TYPES:
-                        continue
-                    if item_type == "text" and isinstance(item.get("text"), str):
-                        text = item.get("text", "").strip()
-                        if text:
-                            parts.append(text)
-                    elif isinstance(item.get("content"), str):
-                        text = item.get("content", "").strip()
-                        if text:
-                            parts.append(text)
-                    elif isinstance(item.get("md"), str):
-                        text = item.get("md", "").strip()
-                        if text:
-                            parts.append(text)
-            return "\n\n".join(parts).strip()
+                item_type = item.get("type")
+                if item_type in self.REASONING_BLOCK_TYPES:
+                    continue
+                # 依次取 text（仅 text 类型）/ content / md，命中即止
+                value = item.get("text") if item_type == "text" else None
+                if not isinstance(value, str):
+                    value = item.get("content")
+                    if not isinstance(value, str):
+                        value = item.get("md")
+                if isinstance(value, str):
+                    text = value.strip()
+                    if text:
+                        parts.append(text)
+            return parts
 
         if isinstance(content, dict):
             for key in ("md", "text", "content"):
                 value = content.get(key)
                 if isinstance(value, str) and value.strip():
-                    return value.strip()
+                    return [value.strip()]
                 if isinstance(value, (list, dict)):
-                    parsed = self._content_to_markdown(value)
+                    parsed = self._content_parts(value)
                     if parsed:
                         return parsed
 
-        return ""
+        return []
+
+    def _scan_reasoning(self, text: str) -> tuple[str, list, bool]:
+        # 去掉 details 块，并按 REASONING_TAG_PAIRS 顺序返回文本中出现的思考标签对；
+        # 第三个返回值表示是否出现过 details 块
+        # 绝大多数回答不含任何思考标记，先用子串判断跳过正则
+        if "<" not in text and "◁" not in text:
+            return text, [], False
+
+        lowered = text.lower()
+
+        # 清理 UI 渲染后的 reasoning details 块
+        has_details = "<details" in lowered
+        if has_details:
+            text = _DETAILS_RE.sub("", text)
+
+        return text, [pair for pair in self._THINK_TAG_PAIRS if pair[0] in lowered], has_details
 
     def _strip_thinking_content(self, text: str) -> str:
         if not text:
             return ""
 
-        cleaned = text
+        cleaned, tag_pairs, _ = self._scan_reasoning(text)
 
-        # 清理 UI 渲染后的 reasoning details 块
-        cleaned = re.sub(
-            r"<details[^>]*type=[\"']reasoning[\"'][^>]*>[\s\S]*?</details>",
-            "",
-            cleaned,
-            flags=re.IGNORECASE,
-        )
-
-        # 清理模型输出中的思考标签
-        for start_tag, end_tag in self.REASONING_TAG_PAIRS:
-            if start_tag.startswith("<") and start_tag.endswith(">") and not start_tag.startswith("<|"):
-                start_tag_pattern = rf"<{re.escape(start_tag[1:-1])}(\s.*?)?>"
-            else:
-                start_tag_pattern = re.escape(start_tag)
-
-            cleaned = re.sub(
-                rf"{start_tag_pattern}[\s\S]*?{re.escape(end_tag)}",
-                "",
-                cleaned,
-                flags=re.IGNORECASE,
-            )
+        # 清理模型输出中的思考标签：逐对依次处理，嵌套或交错的标签也与逐对全量替换结果一致；
+        # 文本中未出现的标签对直接跳过
+        for _, closed_re, unclosed_re in tag_pairs:
+            cleaned = closed_re.sub("", cleaned)
             # 若标签未闭合，兜底去掉到结尾
-            cleaned = re.sub(
-                rf"{start_tag_pattern}[\s\S]*$",
-                "",
-                cleaned,
-                flags=re.IGNORECASE,
-            )
+            cleaned = unclosed_re.sub("", cleaned)
+        return _collapse_blank_lines(cleaned)
 
-        cleaned = re.sub(r"\n{3,}", "\n\n", cleaned)
-        return cleaned.strip()
+    def _clean_text_chunk(self, text: str) -> Optional[str]:
+        # 清理单个内容片段；片段内有多种思考标签交错，或有未闭合的思考块（可能延续到后续片段）时返回 None
+        cleaned, tag_pairs, has_details = self._scan_reasoning(text)
+        if len(tag_pairs) > 1 or (has_details and _DETAILS_OPEN_RE.search(cleaned)):
+            return None
+        if tag_pairs:
+            _, closed_re, unclosed_re = tag_pairs[0]
+            cleaned = closed_re.sub("", cleaned)
+            if unclosed_re.search(cleaned):
+                return None
+        return _collapse_blank_lines(cleaned)
 
     def _extract_chat_title(self, body: dict, user_id: str) -> str:
         # 先从 body 里直接拿，避免不必要查询
-        direct_candidates = [
-            body.get("chat_title"),
-            body.get("title"),
-            (body.get("chat") or {}).get("title") if isinstance(body.get("chat"), dict) else None,
-        ]
-        for candidate in direct_candidates:
-            if isinstance(candidate, str) and candidate.strip():
-                return candidate.strip()
+        title = body.get("chat_title")
+        if isinstance(title, str) and title.strip():
+            return title.strip()
+        title = body.get("title")
+        if isinstance(title, str) and title.strip():
+            return title.strip()
+        chat = body.get("chat")
+        if isinstance(chat, dict):
+            title = chat.get("title")
+            if isinstance(title, str) and title.strip():
+                return title.strip()
 
         chat_id = body.get("chat_id")
         if not isinstance(chat_id, str) or not chat_id.strip():
             return ""
 
-        try:
-            from open_webui.models.chats import Chats
+        key = (chat_id, user_id)
+        cached = _CHAT_TITLE_CACHE.get(key)
+        if cached is not None:
+            return cached
 
+        try:
+            (Chats,) = _cached_import("open_webui.models.chats", "Chats")
             chat = Chats.get_chat_by_id_and_user_id(chat_id, user_id)
             if chat and isinstance(chat.title, str) and chat.title.strip():
-                return chat.title.strip()
+                title = chat.title.strip()
+                _CHAT_TITLE_CACHE.put(key, title)
+                return title
         except Exception:
             pass
 
         return ""
 
-    def _extract_target_content(self, body: dict) -> str:
+    def _extract_target_parts(self, body: dict) -> list[str]:
+        # 本次调用内按对象 id 缓存解析结果：body["message"] 常与 messages 中的某条是同一对象
+        cache: dict[int, list[str]] = {}
+
+        def to_parts(content: Any) -> list[str]:
+            key = id(content)
+            parsed = cache.get(key)
+            if parsed is None:
+                parsed = cache[key] = self._content_parts(content)
+            return parsed
+
         # 优先读取“当前被点击消息”
         direct_msg = body.get("message")
         if isinstance(direct_msg, dict):
-            direct_content = self._content_to_markdown(direct_msg.get("content"))
-            if direct_content:
-                return direct_content
+            direct_parts = to_parts(direct_msg.get("content"))
+            if direct_parts:
+                return direct_parts
 
         messages = body.get("messages", [])
         if isinstance(messages, list) and messages:
-            # 优先最后一条 assistant 消息
+            # 一次倒序遍历：优先最后一条 assistant 消息，兜底最后一条有内容的消息
+            last_any: list[str] = []
             for msg in reversed(messages):
                 if not isinstance(msg, dict):
                     continue
+                parts = to_parts(msg.get("content"))
+                if not parts:
+                    continue
                 if msg.get("role") == "assistant":
-                    content = self._content_to_markdown(msg.get("content"))
-                    if content:
-                        return content
+                    return parts
+                if not last_any:
+                    last_any = parts
+            return last_any
+
+        return []
+
+    def _extract_cleaned_content(self, body: dict) -> str:
+        # 逐片段清理思考内容再拼接，不先拼出整段原文再整体扫描
+        parts = self._extract_target_parts(body)
+        if len(parts) == 1:
+            return self._strip_thinking_content(parts[0])
+
+        cleaned_parts = []
+        for part in parts:
+            cleaned = self._clean_text_chunk(part)
+            if cleaned is None:
+                # 思考块跨越多个片段，回退到整体清理
+                return self._strip_thinking_content("\n\n".join(parts))
+            if cleaned:
+                cleaned_parts.append(cleaned)
+        return "\n\n".join(cleaned_parts)
+
+    def _find_duplicate_note(self, Notes, user_id: str, content_hash: str, content: str):
+        key = (user_id, content_hash)
+        note_id = _RECENT_SAVES.get(key)
+        if note_id is not None:
+            # 近期保存过：按主键确认笔记仍存在（可能已被用户删除）
+            note = Notes.get_note_by_id(note_id)
+            if note:
+                return note
+            _RECENT_SAVES.pop(key)
+
+        note = self._query_duplicate_note(Notes, user_id, content_hash, content)
+        if note:
+            _RECENT_SAVES.put(key, note.id)
+        return note
+
+    def _query_duplicate_note(self, Notes, user_id: str, content_hash: str, content: str):
+        # 优先按 meta 中的内容哈希直接查询，不受扫描数量限制
+        try:
+            (get_db,) = _cached_import("open_webui.internal.db", "get_db")
+            (Note,) = _cached_import("open_webui.models.notes", "Note")
 
-            # 兜底：最后一条有内容的消息
-            for msg in reversed(messages):
-                if not isinstance(msg, dict):
-                    continue
-                content = self._content_to_markdown(msg.get("content"))
-                if content:
-                    return content
+            with get_db() as db:
+                query = db.query(Note.id, Note.title).filter(
+                    Note.user_id == user_id,
+                    Note.meta["source"].as_string() == self.NOTE_SOURCE,
+                )
+                note = query.filter(
+                    Note.meta["content_blake2b"].as_string() == content_hash
+                ).first()
+                if note:
+                    return note
+
+                # 旧版本保存的笔记只有 content_sha256；该用户确有此类笔记时才计算全文 SHA-256
+                has_legacy = _LEGACY_NOTE_USERS.get(user_id)
+                if has_legacy is None:
+                    has_legacy = (
+                        query.filter(Note.meta["content_sha256"].as_string().isnot(None)).first()
+                        is not None
+                    )
+                    _LEGACY_NOTE_USERS.put(user_id, has_legacy)
+                if not has_legacy:
+                    return None
+                return query.filter(
+                    Note.meta["content_sha256"].as_string() == _legacy_content_hash(content)
+                ).first()
+        except Exception:
+            pass
 
-        return ""
+        # 兜底：直接查询不可用时扫描最近的笔记
+        recent_notes = Notes.get_notes_by_user_id(
+            user_id=user_id,
+            permission="write",
+            limit=self.valves.duplicate_scan_limit,
+        )
+        legacy_notes = []
+        for note in recent_notes:
+            meta = note.meta
+            # 无 meta 或非本插件创建的笔记先行跳过，再比较哈希
+            if not meta or meta.get("source") != self.NOTE_SOURCE:
+                continue
+            if meta.get("content_blake2b") == content_hash:
+                return note
+            if meta.get("content_sha256"):
+                legacy_notes.append(note)
+
+        # 扫描范围内存在旧版本笔记时才计算 SHA-256
+        if legacy_notes:
+            legacy_hash = _legacy_content_hash(content)
+            for note in legacy_notes:
+                if note.meta.get("content_sha256") == legacy_hash:
+                    return note
+        return None
 
     def _build_title(self, content: str, prefix: str, max_len: int) -> str:
+        # 逐行 find 换行符，只切出需要的那一行，不为整段内容建行列表
         first_line = ""
-        for line in content.splitlines():
-            clean = re.sub(r"^#+\s*", "", line).strip()
+        start = 0
+        length = len(content)
+        while start < length:
+            end = content.find("\n", start)
+            if end < 0:
+                end = length
+            # 段内仍可能有 \r、U+2028 等其他换行符，按 splitlines() 再切分以保持一致
+            clean = ""
+            for line in content[start:end].splitlines():
+                clean = line.lstrip("#").strip()
+                if clean:
+                    break
             if clean:
                 first_line = clean
                 break
+            start = end + 1
 
         if not first_line:
             first_line = "新笔记"
 
-        first_line = re.sub(r"\s+", " ", first_line).strip()
+        first_line = _WS_RE.sub(" ", first_line).strip()
         if len(first_line) > max_len:
             first_line = f"{first_line[: max_len - 1]}…"
 
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
+        timestamp = _minute_timestamp()
         return f"{prefix} | {first_line} | {timestamp}"
 
     async def _emit(self, __event_emitter__, event_type: str, data: dict):
         if __event_emitter__:
             await __event_emitter__({"type": event_type, "data": data})
 
+    async def _emit_done(self, __event_emitter__, notification: dict):
+        # 结束状态与结果通知互不依赖，并发发送
+        await asyncio.gather(
+            self._emit(__event_emitter__, "status", {"description": "", "done": True}),
+            self._emit(__event_emitter__, "notification", notification),
+        )
+
     async def action(
         self,
         body: dict,
@@ -252,8 +527,7 @@ class Action:
         title_prefix = user_valves.title_prefix or self.valves.title_prefix
         ask_title = user_valves.ask_title or self.valves.ask_title
 
-        content = self._extract_target_content(body)
-        content = self._strip_thinking_content(content)
+        content = self._extract_cleaned_content(body)
         if not content:
             await self._emit(
                 __event_emitter__,
@@ -269,53 +543,38 @@ class Action:
         )
 
         try:
-            from open_webui.models.notes import NoteForm, Notes
+            NoteForm, Notes = _cached_import("open_webui.models.notes", "NoteForm", "Notes")
         except Exception as e:
-            await self._emit(
+            await self._emit_done(
                 __event_emitter__,
-                "status",
-                {"description": "", "done": True},
-            )
-            await self._emit(
-                __event_emitter__,
-                "notification",
                 {"type": "error", "content": f"Notes 模块不可用: {e}"},
             )
             return None
 
         user_id = __user__["id"]
-        content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        # 以全文长度作为 key，区分前缀相同但长度不同的回答
+        content_hash = hashlib.blake2b(
+            content[:_HASH_PREFIX_CHARS].encode("utf-8"),
+            digest_size=16,
+            key=str(len(content)).encode("utf-8"),
+        ).hexdigest()
 
         if self.valves.prevent_duplicates:
             try:
-                recent_notes = Notes.get_notes_by_user_id(
-                    user_id=user_id,
-                    permission="write",
-                    limit=self.valves.duplicate_scan_limit,
-                )
-                for note in recent_notes:
-                    meta = note.meta or {}
-                    if (
-                        meta.get("source") == "save_reply_to_note_action"
-                        and meta.get("content_sha256") == content_hash
-                    ):
-                        await self._emit(
-                            __event_emitter__,
-                            "status",
-                            {"description": "", "done": True},
-                        )
-                        await self._emit(
-                            __event_emitter__,
-                            "notification",
-                            {
-                                "type": "info",
-                                "content": f"这条回答已保存过（Note ID: {note.id}）。",
-                            },
-                        )
-                        return {"status": "duplicate", "id": note.id, "title": note.title}
+                duplicate = self._find_duplicate_note(Notes, user_id, content_hash, content)
             except Exception:
                 # 重复检测失败不阻断主流程
-                pass
+                duplicate = None
+
+            if duplicate:
+                await self._emit_done(
+                    __event_emitter__,
+                    {
+                        "type": "info",
+                        "content": f"这条回答已保存过（Note ID: {duplicate.id}）。",
+                    },
+                )
+                return {"status": "duplicate", "id": duplicate.id, "title": duplicate.title}
 
         chat_title = self._extract_chat_title(body, user_id)
         title = (
@@ -340,37 +599,33 @@ class Action:
             except Exception:
                 pass
 
-        note_form = NoteForm(
+        # 表单由本函数构造、字段已知合法，Pydantic v2 下跳过校验直接构造
+        build_form = getattr(NoteForm, "model_construct", NoteForm)
+        note_form = build_form(
             title=title,
             data={"content": {"md": content}},
             meta={
-                "source": "save_reply_to_note_action",
+                "source": self.NOTE_SOURCE,
                 "chat_id": body.get("chat_id"),
                 "message_id": body.get("id"),
-                "content_sha256": content_hash,
+                "content_blake2b": content_hash,
             },
             access_control={},  # 私有：仅拥有者可访问
         )
 
         new_note = Notes.insert_new_note(user_id=user_id, form_data=note_form)
 
-        await self._emit(
-            __event_emitter__,
-            "status",
-            {"description": "", "done": True},
-        )
-
         if not new_note:
-            await self._emit(
+            await self._emit_done(
                 __event_emitter__,
-                "notification",
                 {"type": "error", "content": "保存失败：未成功创建笔记。"},
             )
             return None
 
-        await self._emit(
+        _RECENT_SAVES.put((user_id, content_hash), new_note.id)
+
+        await self._emit_done(
             __event_emitter__,
-            "notification",
             {
                 "type": "success",
                 "content": f"已保存为笔记：{new_note.title}",